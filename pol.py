@@ -1,97 +1,191 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import requests
+from requests.adapters import HTTPAdapter, Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 
-def fetch_stock_data(symbol, api_key, start_date, end_date):
-    """Fetch stock data from Polygon.io API"""
-    url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}?adjusted=true&sort=asc&apiKey={api_key}"
-    
-    response = requests.get(url)
-    data = response.json()
-    
-    if "results" not in data:
-        st.error(f"Error fetching data for {symbol}: {data.get('error', 'Unknown error')}")
-        return None
-        
-    return data
-
+# Shared session: keep-alive pooling amortizes the TLS handshake across
+# symbols and threads, and Retry backs off automatically on Polygon 429s
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    # raise_on_status=False hands the final errored response back instead of
+    # raising RetryError, so a persisted 429 flows through the normal
+    # no-results error path and gets a readable message
+    max_retries=Retry(total=3, backoff_factor=0.2,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      raise_on_status=False)
+))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # LLVM-compiled row-wise weighted sum; the explicit loop form keeps the
+    # door open for per-date weight schedules later
+    @njit(cache=True, fastmath=True)
+    def _weighted_sum(matrix, weight_vector):
+        out = np.empty(matrix.shape[0])
+        for d in range(matrix.shape[0]):
+            total = 0.0
+            for i in range(matrix.shape[1]):
+                total += matrix[d, i] * weight_vector[i]
+            out[d] = total
+        return out
+else:
+    def _weighted_sum(matrix, weight_vector):
+        return matrix @ weight_vector
+
+class FetchError(RuntimeError):
+    """Raised when a Polygon fetch fails for a symbol"""
+
+# Cache on (symbol, start, end); underscore args are excluded from the key
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_stock_data(symbol, _api_key, start_date, end_date):
+    """Fetch stock data from Polygon.io API, following pagination"""
+    url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}?adjusted=true&sort=asc&apiKey={_api_key}"
+
+    # Long windows come back paginated; keep following next_url so results
+    # aren't silently truncated at the page limit
+    results = []
+    error = None
+    while url:
+        response = _session.get(url, timeout=10)
+        # orjson parses large aggregate payloads ~2-3x faster than the stdlib
+        data = orjson.loads(response.content) if orjson is not None else response.json()
+
+        if "results" not in data:
+            error = data.get('error', 'Unknown error')
+            break
+
+        results.extend(data['results'])
+        next_url = data.get('next_url')
+        url = f"{next_url}&apiKey={_api_key}" if next_url else None
+
+    if error is not None or not results:
+        # Raise rather than return None: st.cache_data memoizes return values
+        # but not exceptions, so a transient failure is never sticky. A
+        # mid-pagination error counts too - returning the pages gathered so
+        # far would cache a silently truncated series for the full TTL. The
+        # caller renders the message - st.error from a worker thread has no
+        # ScriptRunContext and would be dropped silently
+        raise FetchError(f"Error fetching data for {symbol}: {error or 'Unknown error'}")
+
+    return {'results': results}
+
+@st.cache_data(ttl=3600, show_spinner=False)
 def process_stock_data(data):
     """Convert Polygon.io data to DataFrame"""
     results = data['results']
-    
-    df = pd.DataFrame(results)
-    df = df.rename(columns={
-        'c': 'close',
-        'v': 'volume',
-        't': 'date',
-        'o': 'open',
-        'h': 'high',
-        'l': 'low',
-        'vw': 'vwap'
-    })
-    
-    # Convert timestamp (milliseconds) to datetime
-    df['date'] = pd.to_datetime(df['date'], unit='ms')
-    df = df.set_index('date')
-    
+
+    # The aggregate schema is fixed, so build typed columns directly instead
+    # of letting pandas iterate a list of dicts and then renaming
+    df = pd.DataFrame({
+        'close': [r['c'] for r in results],
+        'volume': [r['v'] for r in results],
+        'open': [r['o'] for r in results],
+        'high': [r['h'] for r in results],
+        'low': [r['l'] for r in results],
+        'vwap': [r.get('vw', 0.0) for r in results],
+        # Convert timestamp (milliseconds) to datetime; utc avoids DST
+        # normalization and cache reuses parses across repeated trading days
+        'date': pd.to_datetime([r['t'] for r in results], unit='ms', utc=True, cache=True)
+    }).set_index('date')
+
+    # float32 is plenty for chart-resolution price math and halves the bytes
+    # moved through the normalization and serialization paths
+    price_cols = ['open', 'high', 'low', 'close', 'vwap']
+    df[price_cols] = df[price_cols].astype('float32')
+
     return df.sort_index()
 
+# st.cache_data hashes the DataFrame dict by content, so reruns that don't
+# change the underlying data or weights skip the whole computation
+@st.cache_data(show_spinner=False)
 def calculate_portfolio_performance(stock_data_dict, weights):
     """Calculate weighted portfolio performance"""
-    normalized_dfs = {}
-    for symbol, df in stock_data_dict.items():
-        normalized_df = df.copy()
-        normalized_df['close'] = (df['close'] / df['close'].iloc[0]) * 100
-        normalized_dfs[symbol] = normalized_df
-
-    common_dates = None
-    for df in normalized_dfs.values():
-        if common_dates is None:
-            common_dates = set(df.index)
-        else:
-            common_dates = common_dates.intersection(set(df.index))
-    
-    common_dates = sorted(list(common_dates))
-    
-    portfolio_values = []
-    for date in common_dates:
-        value = 0
-        for symbol, weight in weights.items():
-            value += normalized_dfs[symbol].loc[date, 'close'] * (weight / 100)
-        portfolio_values.append({'date': date, 'value': value})
+    # Inner join aligns all symbols on their common dates in one pass
+    closes = pd.concat({symbol: df['close'] for symbol, df in stock_data_dict.items()},
+                       axis=1, join='inner')
 
-    return pd.DataFrame(portfolio_values).set_index('date')
+    # Normalize each column to 100 at the first common date
+    normalized = closes.div(closes.iloc[0]).mul(100)
 
+    # Weighted sum across symbols in one compiled/BLAS pass
+    weight_vector = np.array([weights[symbol] / 100 for symbol in normalized.columns])
+    values = _weighted_sum(normalized.to_numpy(), weight_vector)
+    portfolio_df = pd.DataFrame({'value': values}, index=normalized.index).rename_axis('date')
+
+    # Hand back the normalized per-symbol frame too so the charts don't
+    # have to recompute it
+    return portfolio_df, normalized
+
+@st.cache_data(show_spinner=False)
 def calculate_combined_volume(stock_data_dict, weights):
     """Calculate weighted volume performance, normalized to 100"""
-    normalized_dfs = {}
-    for symbol, df in stock_data_dict.items():
-        normalized_df = df.copy()
-        normalized_df['volume'] = (df['volume'] / df['volume'].iloc[0]) * 100
-        normalized_dfs[symbol] = normalized_df
-
-    common_dates = None
-    for df in normalized_dfs.values():
-        if common_dates is None:
-            common_dates = set(df.index)
+    volumes = pd.concat({symbol: df['volume'] for symbol, df in stock_data_dict.items()},
+                        axis=1, join='inner')
+
+    normalized = volumes.div(volumes.iloc[0]).mul(100)
+
+    weight_vector = np.array([weights[symbol] / 100 for symbol in normalized.columns])
+    volumes_out = _weighted_sum(normalized.to_numpy(), weight_vector)
+    volume_df = pd.DataFrame({'volume': volumes_out}, index=normalized.index).rename_axis('date')
+
+    return volume_df, normalized
+
+def lttb_downsample(y, n_out=1500):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the positions of the n_out points that best preserve the visual
+    shape of the series, so Plotly never has to draw more points than that.
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64)
+
+    # Bucket edges over the interior; first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_lo, avg_hi = edges[i + 1], edges[i + 2]
         else:
-            common_dates = common_dates.intersection(set(df.index))
-    
-    common_dates = sorted(list(common_dates))
-    
-    portfolio_volumes = []
-    for date in common_dates:
-        weighted_volume = 0
-        for symbol, weight in weights.items():
-            weighted_volume += normalized_dfs[symbol].loc[date, 'volume'] * (weight / 100)
-        portfolio_volumes.append({'date': date, 'volume': weighted_volume})
+            avg_lo, avg_hi = n - 1, n
+        avg_x = x[avg_lo:avg_hi].mean()
+        avg_y = y[avg_lo:avg_hi].mean()
+
+        # Pick the bucket point forming the largest triangle with the
+        # previously selected point and the next bucket's average
+        areas = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev])
+                       - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(areas))
+        selected[i + 1] = prev
 
-    return pd.DataFrame(portfolio_volumes).set_index('date')
+    return selected
 
-def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
+def display_synchronized_charts(stock_data_dict, weights, portfolio_df, normalized_close_df):
     """Display price and volume charts with synchronized hover effects and matching x-axes"""
     st.markdown("""
     <style>
@@ -102,36 +196,51 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
     """, unsafe_allow_html=True)
 
     # Calculate combined volume
-    combined_volume_df = calculate_combined_volume(stock_data_dict, weights)
+    combined_volume_df, normalized_volume_df = calculate_combined_volume(stock_data_dict, weights)
     
-    # Find the complete date range
-    all_dates = sorted(portfolio_df.index)
-    x_range = [all_dates[0], all_dates[-1]]
+    # Find the complete date range (index is already sorted ascending)
+    x_range = [portfolio_df.index[0], portfolio_df.index[-1]]
     
     # Create price chart
     price_fig = go.Figure()
     
-    # Add individual stock lines
-    for symbol, df in stock_data_dict.items():
-        normalized_prices = (df['close'] / df['close'].iloc[0]) * 100
-        price_fig.add_trace(go.Scatter(
-            x=df.index,
-            y=normalized_prices,
-            name=f"{symbol} ({weights[symbol]}%)",
-            line=dict(dash='dash'),
-            customdata=df[['close', 'vwap']],
-            hovertemplate="<br>".join([
-                "Date: %{x}",
-                "Normalized: %{y:.2f}",
-                "Price: $%{customdata[0]:.2f}",
-                "VWAP: $%{customdata[1]:.2f}"
-            ])
-        ))
+    # Add individual stock lines as a single null-separated trace so hover
+    # picking and draw calls scale with point count, not symbol count
+    xs, ys, texts = [], [], []
+    for symbol, normalized_prices in normalized_close_df.items():
+        raw = stock_data_dict[symbol].reindex(normalized_prices.index)
+        keep = lttb_downsample(normalized_prices.to_numpy())
+        name = f"{symbol} ({weights[symbol]}%)"
+        xs.extend(normalized_prices.index[keep])
+        ys.extend(normalized_prices.iloc[keep])
+        # Final hover strings are built here so the browser never expands a
+        # template or ships a customdata block
+        texts.extend(
+            f"<b>{name}</b><br>Date: {d:%Y-%m-%d}<br>Normalized: {n:.2f}"
+            f"<br>Price: ${c:.2f}<br>VWAP: ${v:.2f}"
+            for d, n, c, v in zip(normalized_prices.index[keep],
+                                  normalized_prices.iloc[keep],
+                                  raw['close'].iloc[keep],
+                                  raw['vwap'].iloc[keep])
+        )
+        xs.append(None)
+        ys.append(None)
+        texts.append("")
+
+    price_fig.add_trace(go.Scattergl(
+        x=xs,
+        y=ys,
+        name="Individual Stocks",
+        line=dict(dash='dash'),
+        text=texts,
+        hovertemplate='%{text}<extra></extra>'
+    ))
 
     # Add portfolio line
-    price_fig.add_trace(go.Scatter(
-        x=portfolio_df.index,
-        y=portfolio_df['value'],
+    keep = lttb_downsample(portfolio_df['value'].to_numpy())
+    price_fig.add_trace(go.Scattergl(
+        x=portfolio_df.index[keep],
+        y=portfolio_df['value'].iloc[keep],
         name="Portfolio",
         line=dict(width=3)
     ))
@@ -139,27 +248,40 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
     # Create volume chart
     volume_fig = go.Figure()
     
-    # Add individual stock volumes
-    for symbol, df in stock_data_dict.items():
-        normalized_volume = (df['volume'] / df['volume'].iloc[0]) * 100
-        volume_fig.add_trace(go.Scatter(
-            x=df.index,
-            y=normalized_volume,
-            name=f"{symbol} ({weights[symbol]}%)",
-            line=dict(dash='dash'),
-            opacity=0.7,
-            customdata=df['volume'],
-            hovertemplate="<br>".join([
-                "Date: %{x}",
-                "Normalized: %{y:.2f}",
-                "Volume: %{customdata:,.0f}"
-            ])
-        ))
+    # Add individual stock volumes as a single null-separated trace
+    xs, ys, texts = [], [], []
+    for symbol, normalized_volume in normalized_volume_df.items():
+        raw = stock_data_dict[symbol].reindex(normalized_volume.index)
+        keep = lttb_downsample(normalized_volume.to_numpy())
+        name = f"{symbol} ({weights[symbol]}%)"
+        xs.extend(normalized_volume.index[keep])
+        ys.extend(normalized_volume.iloc[keep])
+        texts.extend(
+            f"<b>{name}</b><br>Date: {d:%Y-%m-%d}<br>Normalized: {n:.2f}"
+            f"<br>Volume: {v:,.0f}"
+            for d, n, v in zip(normalized_volume.index[keep],
+                               normalized_volume.iloc[keep],
+                               raw['volume'].iloc[keep])
+        )
+        xs.append(None)
+        ys.append(None)
+        texts.append("")
+
+    volume_fig.add_trace(go.Scattergl(
+        x=xs,
+        y=ys,
+        name="Individual Volumes",
+        line=dict(dash='dash'),
+        opacity=0.7,
+        text=texts,
+        hovertemplate='%{text}<extra></extra>'
+    ))
     
     # Add combined volume line
-    volume_fig.add_trace(go.Scatter(
-        x=combined_volume_df.index,
-        y=combined_volume_df['volume'],
+    keep = lttb_downsample(combined_volume_df['volume'].to_numpy())
+    volume_fig.add_trace(go.Scattergl(
+        x=combined_volume_df.index[keep],
+        y=combined_volume_df['volume'].iloc[keep],
         name="Combined Volume",
         line=dict(width=3)
     ))
@@ -175,7 +297,7 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
             xanchor="left",
             x=0.01
         ),
-        hovermode="x unified",
+        hovermode="x",
         xaxis=dict(
             range=x_range,
             showspikes=True,
@@ -188,7 +310,9 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
         ),
         hoverdistance=1,
         dragmode='zoom',
-        spikedistance=1000
+        # -1 makes spikes follow hoverdistance instead of scanning every
+        # point in every trace on each mousemove
+        spikedistance=-1
     )
 
     # Update price chart layout
@@ -231,21 +355,30 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
             if (!priceChart || !volumeChart) return;
 
             function synchronizeHover(eventData) {
-                const xValue = eventData.xvals[0];
-                
+                const target = +new Date(eventData.xvals[0]);
+
                 // Find nearest points on both charts
                 const priceData = priceChart.data;
                 const volumeData = volumeChart.data;
-                
+
+                // Memoize numeric timestamps per trace so the hot path never
+                // constructs Date objects; cleared when traces change
+                if (!priceChart._xRuns || priceChart._xRuns.length !== priceData.length) {
+                    priceChart._xRuns = priceData.map(d => buildRuns(d.x));
+                }
+                if (!volumeChart._xRuns || volumeChart._xRuns.length !== volumeData.length) {
+                    volumeChart._xRuns = volumeData.map(d => buildRuns(d.x));
+                }
+
                 // Create hover data for both charts
                 const priceHoverData = priceData.map((_, i) => ({
                     curveNumber: i,
-                    pointNumber: findNearestPoint(priceData[i].x, xValue)
+                    pointNumber: findNearestPoint(priceChart._xRuns[i], target)
                 }));
-                
+
                 const volumeHoverData = volumeData.map((_, i) => ({
                     curveNumber: i,
-                    pointNumber: findNearestPoint(volumeData[i].x, xValue)
+                    pointNumber: findNearestPoint(volumeChart._xRuns[i], target)
                 }));
 
                 // Trigger hover on both charts
@@ -253,39 +386,82 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
                 Plotly.Fx.hover(volumeChart, volumeHoverData);
             }
 
-            function findNearestPoint(xArray, target) {
-                if (!xArray || !xArray.length) return 0;
-                
-                let nearest = 0;
-                let minDiff = Math.abs(new Date(xArray[0]) - new Date(target));
-                
-                for (let i = 1; i < xArray.length; i++) {
-                    const diff = Math.abs(new Date(xArray[i]) - new Date(target));
-                    if (diff < minDiff) {
-                        minDiff = diff;
-                        nearest = i;
+            // The merged per-symbol trace is null-delimited, so its x array
+            // is only sorted within each run; split into monotonic runs and
+            // remember each run's offset into the full point array
+            function buildRuns(xArray) {
+                const runs = [];
+                let start = 0;
+                let xs = [];
+                for (let i = 0; i < xArray.length; i++) {
+                    if (xArray[i] === null || xArray[i] === undefined) {
+                        if (xs.length) runs.push({ start, xs });
+                        xs = [];
+                        start = i + 1;
+                    } else {
+                        xs.push(+new Date(xArray[i]));
                     }
                 }
-                return nearest;
+                if (xs.length) runs.push({ start, xs });
+                return runs;
             }
 
-            // Add mouse move event listener to container
+            function findNearestPoint(runs, target) {
+                if (!runs || !runs.length) return 0;
+
+                let best = runs[0].start;
+                let bestDiff = Infinity;
+                for (const run of runs) {
+                    // Binary search: timestamps are sorted ascending per run
+                    let lo = 0;
+                    let hi = run.xs.length - 1;
+                    while (lo < hi) {
+                        const mid = (lo + hi) >> 1;
+                        if (run.xs[mid] < target) {
+                            lo = mid + 1;
+                        } else {
+                            hi = mid;
+                        }
+                    }
+                    if (lo > 0 && target - run.xs[lo - 1] < run.xs[lo] - target) {
+                        lo -= 1;
+                    }
+                    const diff = Math.abs(run.xs[lo] - target);
+                    if (diff < bestDiff) {
+                        bestDiff = diff;
+                        best = run.start + lo;
+                    }
+                }
+                return best;
+            }
+
+            // Add mouse move event listener to container, coalescing
+            // mousemove bursts into at most one hover update per frame
             const container = document.querySelector('.stPlotlyChart');
+            let rafId = null;
+            let lastEvent = null;
             container.addEventListener('mousemove', (e) => {
-                const rect = priceChart.getBoundingClientRect();
-                const x = e.clientX - rect.left;
-                const y = e.clientY - rect.top;
-                
-                if (x >= 0 && x <= rect.width && y >= 0 && y <= rect.height) {
-                    const xaxis = priceChart._fullLayout.xaxis;
-                    const xValue = xaxis.p2d(x);
-                    
-                    synchronizeHover({ xvals: [xValue] });
-                }
+                lastEvent = e;
+                if (rafId) return;
+                rafId = requestAnimationFrame(() => {
+                    rafId = null;
+                    const rect = priceChart.getBoundingClientRect();
+                    const x = lastEvent.clientX - rect.left;
+                    const y = lastEvent.clientY - rect.top;
+
+                    if (x >= 0 && x <= rect.width && y >= 0 && y <= rect.height) {
+                        const xaxis = priceChart._fullLayout.xaxis;
+                        const xValue = xaxis.p2d(x);
+
+                        synchronizeHover({ xvals: [xValue] });
+                    }
+                });
             });
 
             // Sync zoom and pan events
             priceChart.on('plotly_relayout', (eventdata) => {
+                priceChart._xRuns = null;
+                volumeChart._xRuns = null;
                 if (eventdata['xaxis.range[0]']) {
                     const update = {
                         'xaxis.range[0]': eventdata['xaxis.range[0]'],
@@ -296,6 +472,8 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
             });
 
             volumeChart.on('plotly_relayout', (eventdata) => {
+                priceChart._xRuns = null;
+                volumeChart._xRuns = null;
                 if (eventdata['xaxis.range[0]']) {
                     const update = {
                         'xaxis.range[0]': eventdata['xaxis.range[0]'],
@@ -317,24 +495,24 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
     # Display statistics
     st.subheader("Trading Statistics")
     
-    stats_data = []
-    for symbol, df in stock_data_dict.items():
-        latest_close = df['close'].iloc[-1]
-        latest_vwap = df['vwap'].iloc[-1]
-        price_change = ((df['close'].iloc[-1] / df['close'].iloc[0]) - 1) * 100
-        avg_volume = df['volume'].mean()
-        
-        stats_data.append({
-            'Symbol': symbol,
-            'Latest Close': f"${latest_close:.2f}",
-            'VWAP': f"${latest_vwap:.2f}",
-            'Price Change': f"{price_change:+.2f}%",
-            'Avg Volume': f"{int(avg_volume):,}",
-            'Weight': f"{weights[symbol]}%"
-        })
-    
-    stats_df = pd.DataFrame(stats_data)
-    st.table(stats_df.set_index('Symbol'))
+    # One vectorized pass per column instead of per-symbol scalar lookups
+    # Inner join, matching the portfolio alignment: an outer join would put
+    # NaN rows wherever one symbol's history is shorter, and iloc[0]/iloc[-1]
+    # would then format as "$nan"
+    closes = pd.concat({s: d['close'] for s, d in stock_data_dict.items()}, axis=1, join='inner')
+    volumes = pd.concat({s: d['volume'] for s, d in stock_data_dict.items()}, axis=1, join='inner')
+    vwaps = pd.concat({s: d['vwap'] for s, d in stock_data_dict.items()}, axis=1, join='inner')
+
+    price_change = (closes.iloc[-1] / closes.iloc[0] - 1) * 100
+
+    stats_df = pd.DataFrame({
+        'Latest Close': closes.iloc[-1].map('${:.2f}'.format),
+        'VWAP': vwaps.iloc[-1].map('${:.2f}'.format),
+        'Price Change': price_change.map('{:+.2f}%'.format),
+        'Avg Volume': volumes.mean().map(lambda v: f"{int(v):,}"),
+        'Weight': pd.Series(weights).map('{}%'.format)
+    }).rename_axis('Symbol')
+    st.table(stats_df)
 
 def main():
     st.set_page_config(layout="wide", page_title="Portfolio Analyzer")
@@ -418,20 +596,36 @@ def main():
     # Fetch and process data for selected stocks
     if st.sidebar.button("Analyze Portfolio") and total_weight == 100:
         with st.spinner("Fetching stock data..."):
-            for stock in st.session_state.stocks:
-                symbol = stock["symbol"]
-                if symbol:
-                    data = fetch_stock_data(symbol, api_key, start_date_str, end_date_str)
-                    if data is not None:
-                        stock_data_dict[symbol] = process_stock_data(data)
-                        weights[symbol] = stock["weight"]
+            # Fetch all symbols concurrently; each request is independent and
+            # I/O-bound, and the module-level session pools connections
+            selected = [stock for stock in st.session_state.stocks if stock["symbol"]]
+            with ThreadPoolExecutor(max_workers=max(len(selected), 1)) as executor:
+                futures = {
+                    stock["symbol"]: executor.submit(
+                        fetch_stock_data, stock["symbol"], api_key,
+                        start_date_str, end_date_str
+                    )
+                    for stock in selected
+                }
+
+            for stock in selected:
+                try:
+                    data = futures[stock["symbol"]].result()
+                except FetchError as e:
+                    st.error(str(e))
+                    continue
+                except requests.RequestException as e:
+                    st.error(f"Error fetching data for {stock['symbol']}: {e}")
+                    continue
+                stock_data_dict[stock["symbol"]] = process_stock_data(data)
+                weights[stock["symbol"]] = stock["weight"]
 
             if stock_data_dict:
                 # Calculate portfolio performance
-                portfolio_df = calculate_portfolio_performance(stock_data_dict, weights)
-                
+                portfolio_df, normalized_close_df = calculate_portfolio_performance(stock_data_dict, weights)
+
                 # Display synchronized charts
-                display_synchronized_charts(stock_data_dict, weights, portfolio_df)
+                display_synchronized_charts(stock_data_dict, weights, portfolio_df, normalized_close_df)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
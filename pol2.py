@@ -1,142 +1,186 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import requests
+from requests.adapters import HTTPAdapter, Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import time
 
-def validate_symbol(symbol, api_key):
+try:
+    # Auto mode hooks the default figure backend, so every trace added below
+    # is LTTB-downsampled to ~1000 visible points and refilled on zoom
+    from plotly_resampler import register_plotly_resampler
+    register_plotly_resampler(mode='auto')
+except ImportError:
+    pass
+
+# One pooled session for all Polygon calls: keep-alive skips the TLS
+# handshake after the first request and Retry backs off on 429/5xx
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    # raise_on_status=False returns the last errored response instead of
+    # raising RetryError, so a persisted 429 surfaces through the normal
+    # error handling rather than a traceback
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 502, 503, 504],
+                      raise_on_status=False)
+))
+
+# API results are memoized with st.cache_data so Streamlit reruns don't
+# re-issue HTTP requests; underscore args stay out of the cache key
+@st.cache_data(ttl=86400, show_spinner=False)
+def validate_symbol(symbol, _api_key):
     """Validate if a stock symbol exists using Polygon.io API"""
-    url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/prev?adjusted=true&apiKey={api_key}"
-    response = requests.get(url)
+    # The reference metadata lookup is much cheaper than fetching a previous
+    # bar, and ticker existence is stable enough to cache for a day
+    url = f"https://api.polygon.io/v3/reference/tickers/{symbol}?apiKey={_api_key}"
+    response = _session.get(url, timeout=10)
     data = response.json()
-    return data.get('status') == 'OK' or 'results' in data
+    return data.get('status') == 'OK' and 'results' in data
 
-def symbol_search(search_text, api_key):
+@st.cache_data(ttl=3600, show_spinner=False)
+def symbol_search(search_text, _api_key):
     """Search for stock symbols using Polygon.io API"""
-    url = f"https://api.polygon.io/v3/reference/tickers?search={search_text}&active=true&sort=ticker&order=asc&limit=10&apiKey={api_key}"
-    response = requests.get(url)
+    url = f"https://api.polygon.io/v3/reference/tickers?search={search_text}&active=true&sort=ticker&order=asc&limit=10&apiKey={_api_key}"
+    response = _session.get(url, timeout=10)
     data = response.json()
-    
+
     if data.get('status') == 'OK' or 'results' in data:
         results = data.get('results', [])
         return [{'symbol': item['ticker'], 'name': item['name']} for item in results]
     return []
 
-def fetch_stock_data(symbol, api_key, start_date, end_date):
+class FetchError(RuntimeError):
+    """Raised when a Polygon fetch fails for a symbol"""
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_stock_data(symbol, _api_key, start_date, end_date):
     """Fetch stock data from Polygon.io API"""
-    url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}?adjusted=true&sort=asc&apiKey={api_key}"
-    
-    response = requests.get(url)
+    url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}?adjusted=true&sort=asc&apiKey={_api_key}"
+
+    response = _session.get(url, timeout=10)
     data = response.json()
-    
+
     if "results" not in data:
-        st.error(f"Error fetching data for {symbol}: {data.get('error', 'Unknown error')}")
-        return None
-        
+        # Raise rather than return None: st.cache_data memoizes return values
+        # but not exceptions, so a transient failure is never sticky - here or
+        # in the cached layers above this one. No st.error here: this runs on
+        # thread-pool workers where Streamlit elements are silently dropped,
+        # so main renders the message when it catches the FetchError
+        raise FetchError(f"Error fetching data for {symbol}: {data.get('error', 'Unknown error')}")
+
     return data
 
 def process_stock_data(data):
     """Convert Polygon.io data to DataFrame"""
     results = data['results']
-    
-    df = pd.DataFrame(results)
-    df = df.rename(columns={
-        'c': 'close',
-        'v': 'volume',
-        't': 'date',
-        'o': 'open',
-        'h': 'high',
-        'l': 'low',
-        'vw': 'vwap'
-    })
-    
-    df['date'] = pd.to_datetime(df['date'], unit='ms')
-    df = df.set_index('date')
-    
-    return df.sort_index()
-
-def calculate_portfolio_performance(stock_data_dict, weights):
-    """Calculate weighted portfolio performance"""
-    normalized_dfs = {}
-    for symbol, df in stock_data_dict.items():
-        normalized_df = df.copy()
-        normalized_df['close'] = (df['close'] / df['close'].iloc[0]) * 100
-        normalized_dfs[symbol] = normalized_df
-
-    common_dates = None
-    for df in normalized_dfs.values():
-        if common_dates is None:
-            common_dates = set(df.index)
-        else:
-            common_dates = common_dates.intersection(set(df.index))
-    
-    common_dates = sorted(list(common_dates))
-    
-    portfolio_values = []
-    for date in common_dates:
-        value = 0
-        for symbol, weight in weights.items():
-            value += normalized_dfs[symbol].loc[date, 'close'] * (weight / 100)
-        portfolio_values.append({'date': date, 'value': value})
-
-    return pd.DataFrame(portfolio_values).set_index('date')
-
-def calculate_combined_volume(stock_data_dict, weights):
-    """Calculate weighted volume performance, normalized to 100"""
-    normalized_dfs = {}
-    for symbol, df in stock_data_dict.items():
-        normalized_df = df.copy()
-        normalized_df['volume'] = (df['volume'] / df['volume'].iloc[0]) * 100
-        normalized_dfs[symbol] = normalized_df
-
-    common_dates = None
-    for df in normalized_dfs.values():
-        if common_dates is None:
-            common_dates = set(df.index)
-        else:
-            common_dates = common_dates.intersection(set(df.index))
-    
-    common_dates = sorted(list(common_dates))
-    
-    portfolio_volumes = []
-    for date in common_dates:
-        weighted_volume = 0
-        for symbol, weight in weights.items():
-            weighted_volume += normalized_dfs[symbol].loc[date, 'volume'] * (weight / 100)
-        portfolio_volumes.append({'date': date, 'volume': weighted_volume})
 
-    return pd.DataFrame(portfolio_volumes).set_index('date')
+    # The aggregate schema is fixed, so fill typed arrays directly instead of
+    # building a frame from row dicts, renaming, and converting afterwards
+    n = len(results)
+    cols = {'c': 'close', 'v': 'volume', 'o': 'open', 'h': 'high', 'l': 'low', 'vw': 'vwap'}
+    ts = np.fromiter((r['t'] for r in results), dtype=np.int64, count=n)
+    df = pd.DataFrame(
+        {name: np.fromiter((r.get(key, 0.0) for r in results), dtype=np.float64, count=n)
+         for key, name in cols.items()},
+        index=pd.DatetimeIndex(ts.view('datetime64[ms]'), name='date')
+    )
 
-def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
-    """Display price and volume charts with synchronized hover effects"""
-    st.markdown("""
-    <style>
-        .stPlotlyChart {
-            height: 400px;
+    # Narrow the storage dtypes: share volumes fit in uint32 and float32 is
+    # ample for chart-resolution prices - halves memory and the JSON payload
+    df['volume'] = df['volume'].astype(np.uint32)
+    price_cols = ['open', 'high', 'low', 'close', 'vwap']
+    df[price_cols] = df[price_cols].astype(np.float32)
+
+    # The aggs request uses sort=asc, so the server already returns the bars
+    # in ascending timestamp order; re-sorting here would be pure overhead
+    if __debug__:
+        assert df.index.is_monotonic_increasing
+
+    return df
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_stock_df(symbol, start_date, end_date, _api_key):
+    """Fetch and process a symbol's data, cached on (symbol, start, end)"""
+    # A FetchError from the fetch layer propagates uncached
+    return process_stock_data(fetch_stock_data(symbol, _api_key, start_date, end_date))
+
+# st.cache_data content-hashes the DataFrame dict and weights, so repeat
+# runs over unchanged data skip the align/normalize/matmul work even when
+# called outside the cached run_analysis pipeline
+@st.cache_data(show_spinner=False)
+def calculate_portfolio_metrics(stock_data_dict, weights):
+    """Calculate weighted price and volume performance, normalized to 100"""
+    # One MultiIndex inner join aligns close and volume on the common dates,
+    # so the alignment work happens once instead of once per metric
+    aligned = pd.concat({symbol: df[['close', 'volume']] for symbol, df in stock_data_dict.items()},
+                        axis=1, join='inner')
+
+    closes = aligned.xs('close', axis=1, level=1)
+    volumes = aligned.xs('volume', axis=1, level=1)
+
+    norm_close = closes.div(closes.iloc[0]).mul(100)
+    norm_volume = volumes.div(volumes.iloc[0]).mul(100)
+
+    w = np.array([weights[symbol] for symbol in closes.columns], dtype=np.float64) / 100.0
+
+    portfolio_df = pd.DataFrame({'value': norm_close.values @ w},
+                                index=aligned.index).rename_axis('date')
+    combined_volume_df = pd.DataFrame({'volume': norm_volume.values @ w},
+                                      index=aligned.index).rename_axis('date')
+
+    # Also hand back the normalized per-symbol frames so the charts can plot
+    # them directly instead of recomputing the same divides
+    return portfolio_df, combined_volume_df, norm_close, norm_volume
+
+@st.cache_data(ttl=600, show_spinner=False)
+def run_analysis(weights_tuple, start_date, end_date, _api_key):
+    """Fetch and aggregate the portfolio, cached on (weights, date window)"""
+    weights = dict(weights_tuple)
+
+    # Requests are independent and I/O-bound, so overlap them; wall time
+    # drops to roughly the slowest single fetch
+    stock_data_dict = {}
+    with ThreadPoolExecutor(max_workers=len(weights)) as executor:
+        futures = {
+            executor.submit(get_stock_df, symbol, start_date, end_date, _api_key): symbol
+            for symbol in weights
         }
-    </style>
-    """, unsafe_allow_html=True)
+        for future in as_completed(futures):
+            # A failed symbol raises here, so the pipeline cache never
+            # stores a partial or empty analysis
+            stock_data_dict[futures[future]] = future.result()
 
-    # Calculate combined volume
-    combined_volume_df = calculate_combined_volume(stock_data_dict, weights)
-    
-    # Find the complete date range
-    all_dates = sorted(portfolio_df.index)
-    x_range = [all_dates[0], all_dates[-1]]
-    
-    # Create price chart
-    price_fig = go.Figure()
-    
-    # Add individual stock lines
-    for symbol, df in stock_data_dict.items():
-        normalized_prices = (df['close'] / df['close'].iloc[0]) * 100
-        price_fig.add_trace(go.Scatter(
-            x=df.index,
+    return (stock_data_dict,) + calculate_portfolio_metrics(stock_data_dict, weights)
+
+def display_synchronized_charts(stock_data_dict, weights, portfolio_df, combined_volume_df,
+                                normalized_close_df, normalized_volume_df):
+    """Display price and volume charts with synchronized hover effects"""
+    # Find the complete date range (index is already sorted ascending)
+    x_range = [portfolio_df.index[0], portfolio_df.index[-1]]
+
+    # Two stacked subplots sharing one x-axis: Plotly keeps hover, zoom,
+    # and pan synchronized natively, with no injected JavaScript
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=("Portfolio Price Performance (Normalized to 100)",
+                        "Trading Volume (Normalized to 100)")
+    )
+
+    # Add individual stock lines from the already-normalized frame
+    for symbol, normalized_prices in normalized_close_df.items():
+        df = stock_data_dict[symbol].reindex(normalized_prices.index)
+        fig.add_trace(go.Scattergl(
+            x=normalized_prices.index.values,
             y=normalized_prices,
             name=f"{symbol} ({weights[symbol]}%)",
             line=dict(dash='dash'),
-            customdata=df[['close', 'vwap']],
+            customdata=df[['close', 'vwap']].to_numpy(),
             hovertemplate="<br>".join([
                 f"<b>{symbol}</b>",
                 "Date: %{x}",
@@ -145,11 +189,11 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
                 "VWAP: $%{customdata[1]:.2f}",
                 "<extra></extra>"
             ])
-        ))
+        ), row=1, col=1)
 
     # Add portfolio line
-    price_fig.add_trace(go.Scatter(
-        x=portfolio_df.index,
+    fig.add_trace(go.Scattergl(
+        x=portfolio_df.index.values,
         y=portfolio_df['value'],
         name="Portfolio",
         line=dict(width=3),
@@ -159,21 +203,18 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
             "Value: %{y:.2f}",
             "<extra></extra>"
         ])
-    ))
+    ), row=1, col=1)
 
-    # Create volume chart
-    volume_fig = go.Figure()
-    
-    # Add individual stock volumes
-    for symbol, df in stock_data_dict.items():
-        normalized_volume = (df['volume'] / df['volume'].iloc[0]) * 100
-        volume_fig.add_trace(go.Scatter(
-            x=df.index,
+    # Add individual stock volumes from the already-normalized frame
+    for symbol, normalized_volume in normalized_volume_df.items():
+        df = stock_data_dict[symbol].reindex(normalized_volume.index)
+        fig.add_trace(go.Scattergl(
+            x=normalized_volume.index.values,
             y=normalized_volume,
             name=f"{symbol} ({weights[symbol]}%)",
             line=dict(dash='dash'),
             opacity=0.7,
-            customdata=df['volume'],
+            customdata=df['volume'].to_numpy(),
             hovertemplate="<br>".join([
                 f"<b>{symbol}</b>",
                 "Date: %{x}",
@@ -181,11 +222,11 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
                 "Volume: %{customdata:,.0f}",
                 "<extra></extra>"
             ])
-        ))
-    
+        ), row=2, col=1)
+
     # Add combined volume line
-    volume_fig.add_trace(go.Scatter(
-        x=combined_volume_df.index,
+    fig.add_trace(go.Scattergl(
+        x=combined_volume_df.index.values,
         y=combined_volume_df['volume'],
         name="Combined Volume",
         line=dict(width=3),
@@ -195,12 +236,11 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
             "Value: %{y:.2f}",
             "<extra></extra>"
         ])
-    ))
+    ), row=2, col=1)
 
-    # Common layout settings
-    common_layout = dict(
+    fig.update_layout(
         template="plotly_white",
-        height=400,
+        height=800,
         showlegend=True,
         legend=dict(
             yanchor="top",
@@ -208,163 +248,54 @@ def display_synchronized_charts(stock_data_dict, weights, portfolio_df):
             xanchor="left",
             x=0.01
         ),
-        xaxis=dict(
-            range=x_range,
-            showspikes=True,
-            spikemode='across',
-            spikesnap='cursor',
-            showline=True,
-            showgrid=True,
-            rangeslider=dict(visible=False),
-            type='date'
-        ),
         hoverdistance=1,
         dragmode='zoom',
         spikedistance=1000,
         hovermode='x unified',
         margin=dict(l=50, r=50, t=50, b=50)
     )
-
-    # Update layouts
-    price_fig.update_layout(
-        title="Portfolio Price Performance (Normalized to 100)",
-        yaxis_title="Value",
-        xaxis_title="",
-        **common_layout
+    fig.update_xaxes(
+        range=x_range,
+        showspikes=True,
+        spikemode='across',
+        spikesnap='cursor',
+        showline=True,
+        showgrid=True,
+        rangeslider=dict(visible=False),
+        type='date'
     )
+    fig.update_yaxes(title_text="Value", row=1, col=1)
+    fig.update_yaxes(title_text="Volume Index", row=2, col=1)
+    fig.update_xaxes(title_text="Date", row=2, col=1)
 
-    volume_fig.update_layout(
-        title="Trading Volume (Normalized to 100)",
-        yaxis_title="Volume Index",
-        xaxis_title="Date",
-        **common_layout
-    )
-
-    # Create containers and display charts
-    price_chart = st.empty()
-    volume_chart = st.empty()
-
-    with price_chart:
-        st.plotly_chart(price_fig, use_container_width=True, key="price")
-    with volume_chart:
-        st.plotly_chart(volume_fig, use_container_width=True, key="volume")
-
-    # Add JavaScript for enhanced synchronization
-    st.markdown("""
-    <script>
-        function waitForCharts(callback) {
-            const interval = setInterval(() => {
-                const charts = document.querySelectorAll('[data-testid="stPlotlyChart"] .js-plotly-plot');
-                if (charts.length >= 2) {
-                    clearInterval(interval);
-                    callback(charts[0], charts[1]);
-                }
-            }, 100);
-        }
-
-        waitForCharts((priceChart, volumeChart) => {
-            if (!priceChart || !volumeChart) return;
-
-            function synchronizeHover(eventData) {
-                const xValue = eventData.xvals[0];
-                
-                const priceData = priceChart.data;
-                const volumeData = volumeChart.data;
-                
-                const priceHoverData = priceData.map((_, i) => ({
-                    curveNumber: i,
-                    pointNumber: findNearestPoint(priceData[i].x, xValue)
-                }));
-                
-                const volumeHoverData = volumeData.map((_, i) => ({
-                    curveNumber: i,
-                    pointNumber: findNearestPoint(volumeData[i].x, xValue)
-                }));
-
-                Plotly.Fx.hover(priceChart, priceHoverData);
-                Plotly.Fx.hover(volumeChart, volumeHoverData);
-            }
-
-            function findNearestPoint(xArray, target) {
-                if (!xArray || !xArray.length) return 0;
-                
-                let nearest = 0;
-                let minDiff = Math.abs(new Date(xArray[0]) - new Date(target));
-                
-                for (let i = 1; i < xArray.length; i++) {
-                    const diff = Math.abs(new Date(xArray[i]) - new Date(target));
-                    if (diff < minDiff) {
-                        minDiff = diff;
-                        nearest = i;
-                    }
-                }
-                return nearest;
-            }
-
-            const container = document.querySelector('.stPlotlyChart');
-            container.addEventListener('mousemove', (e) => {
-                const rect = priceChart.getBoundingClientRect();
-                const x = e.clientX - rect.left;
-                const y = e.clientY - rect.top;
-                
-                if (x >= 0 && x <= rect.width && y >= 0 && y <= rect.height) {
-                    const xaxis = priceChart._fullLayout.xaxis;
-                    const xValue = xaxis.p2d(x);
-                    
-                    synchronizeHover({ xvals: [xValue] });
-                }
-            });
-
-            container.addEventListener('mouseleave', () => {
-                Plotly.Fx.unhover(priceChart);
-                Plotly.Fx.unhover(volumeChart);
-            });
-
-            // Sync zoom/pan events
-            priceChart.on('plotly_relayout', (eventdata) => {
-                if (eventdata['xaxis.range[0]']) {
-                    const update = {
-                        'xaxis.range[0]': eventdata['xaxis.range[0]'],
-                        'xaxis.range[1]': eventdata['xaxis.range[1]']
-                    };
-                    Plotly.relayout(volumeChart, update);
-                }
-            });
-
-            volumeChart.on('plotly_relayout', (eventdata) => {
-                if (eventdata['xaxis.range[0]']) {
-                    const update = {
-                        'xaxis.range[0]': eventdata['xaxis.range[0]'],
-                        'xaxis.range[1]': eventdata['xaxis.range[1]']
-                    };
-                    Plotly.relayout(priceChart, update);
-                }
-            });
-        });
-    </script>
-    """, unsafe_allow_html=True)
+    # Display the combined chart; the stable key lets Streamlit update the
+    # existing component in place on rerun
+    st.plotly_chart(fig, use_container_width=True, key="charts")
 
     # Display statistics
     st.subheader("Trading Statistics")
     
-    stats_data = []
-    for symbol, df in stock_data_dict.items():
-        latest_close = df['close'].iloc[-1]
-        latest_vwap = df['vwap'].iloc[-1]
-        price_change = ((df['close'].iloc[-1] / df['close'].iloc[0]) - 1) * 100
-        avg_volume = df['volume'].mean()
-        
-        stats_data.append({
-            'Symbol': symbol,
-            'Latest Close': f"${latest_close:.2f}",
-            'VWAP': f"${latest_vwap:.2f}",
-            'Price Change': f"{price_change:+.2f}%",
-            'Avg Volume': f"{int(avg_volume):,}",
-            'Weight': f"{weights[symbol]}%"
-        })
-    
-    stats_df = pd.DataFrame(stats_data)
-    st.table(stats_df.set_index('Symbol'))
+    # Stack the raw columns once and reduce each stat in a single pass
+    # across all symbols rather than per-symbol scalar lookups
+    # Inner join, matching the portfolio alignment: an outer join leaves NaN
+    # edges for symbols with shorter histories, which the formatters would
+    # render as "$nan"
+    closes = pd.concat({s: d['close'] for s, d in stock_data_dict.items()}, axis=1, join='inner')
+    volumes = pd.concat({s: d['volume'] for s, d in stock_data_dict.items()}, axis=1, join='inner')
+    vwaps = pd.concat({s: d['vwap'] for s, d in stock_data_dict.items()}, axis=1, join='inner')
+
+    price_change = (closes.iloc[-1] / closes.iloc[0] - 1) * 100
+
+    stats_df = pd.DataFrame({
+        'Latest Close': closes.iloc[-1].map('${:.2f}'.format),
+        'VWAP': vwaps.iloc[-1].map('${:.2f}'.format),
+        'Price Change': price_change.map('{:+.2f}%'.format),
+        'Avg Volume': volumes.mean().map(lambda v: f"{int(v):,}"),
+        # Index the weights by the symbols we actually have data for, so a
+        # failed fetch doesn't leave a row with only a Weight filled in
+        'Weight': pd.Series({s: weights[s] for s in stock_data_dict}).map('{}%'.format)
+    }).rename_axis('Symbol')
+    st.table(stats_df)
 
     
 def stock_picker_section():
@@ -481,20 +412,26 @@ def main():
 
     # Fetch and process data for selected stocks
     if st.sidebar.button("Analyze Portfolio") and len(weights) > 0 and sum(weights.values()) == 100:
-        stock_data_dict = {}
-        
         with st.spinner("Fetching stock data..."):
-            for symbol, weight in weights.items():
-                data = fetch_stock_data(symbol, api_key, start_date_str, end_date_str)
-                if data is not None:
-                    stock_data_dict[symbol] = process_stock_data(data)
-
-            if stock_data_dict:
-                # Calculate portfolio performance
-                portfolio_df = calculate_portfolio_performance(stock_data_dict, weights)
-                
-                # Display synchronized charts
-                display_synchronized_charts(stock_data_dict, weights, portfolio_df)
+            # The whole fetch + aggregate pipeline is cached on the hashable
+            # inputs, so reruns with unchanged settings skip it entirely
+            try:
+                analysis = run_analysis(tuple(sorted(weights.items())),
+                                        start_date_str, end_date_str, api_key)
+            except FetchError as e:
+                st.error(str(e))
+                analysis = None
+            except requests.RequestException as e:
+                st.error(f"Error fetching data: {e}")
+                analysis = None
+
+        if analysis is not None:
+            stock_data_dict, portfolio_df, combined_volume_df, \
+                normalized_close_df, normalized_volume_df = analysis
+
+            # Display synchronized charts
+            display_synchronized_charts(stock_data_dict, weights, portfolio_df, combined_volume_df,
+                                        normalized_close_df, normalized_volume_df)
     elif len(weights) == 0:
         st.info("Please add at least one stock to your portfolio.")
 